@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Check that importing the package stays fast.
+
+Checks are defined in ``tests/pytest_helpers/import_time.py``; ``pytest``
+checks that no module imports a heavy dependency at load. This script also
+checks the cumulative import time of every module against a budget.
+
+Usage:
+
+.. code-block:: bash
+
+   python benchmarks/import_time.py [budget_ms]
+
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "tests"))
+from pytest_helpers.import_time import (  # noqa: E402
+    DEFAULT_BUDGET_MS,
+    check,
+    modules,
+)
+
+
+def main() -> int:
+    """Check every module, return an exit code."""
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS
+    errors = []
+    for module in modules():
+        errors += check(module, budget_ms)
+    for error in errors:
+        print(error)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
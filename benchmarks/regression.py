@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Report the speedup of optimized pipelines over the reference one.
+
+Pipelines and the comparison with the reference are defined in
+``tests/pytest_helpers/regression.py``; ``pytest`` checks that every candidate
+matches the reference. This script also times them, on the bundled
+measurements and on synthetic trees.
+
+Usage:
+
+.. code-block:: bash
+
+   python benchmarks/regression.py [base_folder]
+
+Exit code is 1 if a candidate does not match the reference.
+
+"""
+
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "tests"))
+from pytest_helpers.regression import (  # noqa: E402
+    BUNDLED,
+    CANDIDATES,
+    FitResult,
+    Pipeline,
+    Tolerances,
+    compare,
+    reference,
+    write_synthetic_tree,
+)
+
+
+def _timed(
+    pipeline: Pipeline, base_folder: Path, repeat: int
+) -> tuple[list[FitResult], float]:
+    """Run ``pipeline`` quietly, give results and best time in s."""
+    best = np.inf
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            results = list(pipeline(base_folder))
+            best = min(best, time.perf_counter() - start)
+    return results, best
+
+
+def run(
+    base_folder: Path,
+    candidates: dict[str, Pipeline] | None = None,
+    tolerances: Tolerances | None = None,
+    repeat: int = 3,
+) -> list[str]:
+    """Compare every candidate with the reference, print the speedups."""
+    if candidates is None:
+        candidates = CANDIDATES
+    if tolerances is None:
+        tolerances = Tolerances()
+    expected, reference_time = _timed(reference, base_folder, repeat)
+    print(f"{base_folder}: reference {1e3 * reference_time:8.1f} ms")
+
+    errors = []
+    for name, pipeline in candidates.items():
+        actual, candidate_time = _timed(pipeline, base_folder, repeat)
+        candidate_errors = compare(expected, actual, tolerances)
+        status = "OK" if not candidate_errors else "FAILED"
+        print(
+            f"{'':>4}{name:<20} {1e3 * candidate_time:8.1f} ms, speedup "
+            f"{reference_time / candidate_time:5.2f}, {status}"
+        )
+        errors += [f"{name}, {base_folder}: {e}" for e in candidate_errors]
+    return errors
+
+
+def main() -> int:
+    """Run the harness on bundled and synthetic data, give exit code."""
+    base_folder = Path(sys.argv[1]) if len(sys.argv) > 1 else BUNDLED
+    errors = run(base_folder)
+    for seed in range(3):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_synthetic_tree(Path(tmp), seed=seed)
+            errors += run(Path(tmp))
+    for error in errors:
+        print(error)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
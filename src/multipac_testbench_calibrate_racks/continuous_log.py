@@ -0,0 +1,221 @@
+"""Extract and fit every power sweep of a long continuous acquisition log.
+
+The file is read by blocks of ``chunksize`` lines, so memory usage does not
+depend on the duration of the acquisition. A sweep is detected as a voltage
+peak, ie a sample that is the maximum of the ``n_p_dbm_points - 1`` samples
+before and after it; the sweep itself is made of the ``n_p_dbm_points``
+samples ending at this peak, as in :class:`.Measurement`. Hence, sweeps logged
+back to back, without any sample between them, are all detected.
+
+"""
+
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from multipac_testbench_calibrate_racks.single_measurement import (
+    Measurement,
+    load_embedded_constants,
+)
+from numpy.lib.stride_tricks import sliding_window_view
+from numpy.typing import NDArray
+
+
+@dataclass(kw_only=True)
+class LogSegment(Measurement):
+    """Hold one sweep extracted from a continuous acquisition log.
+
+    Parameters
+    ----------
+    full_sample :
+        Sample indexes around the sweep.
+    full_voltage :
+        Measured voltage around the sweep.
+    index :
+        Position of the sweep in the log.
+    frequency :
+        Frequency of the sweep in MHz. If not provided, it is taken from the
+        name of the log file, as for :class:`.Measurement`.
+    embedded_constants :
+        ``a``, ``b``, ``g`` stored in the log file, read once for all sweeps.
+
+    """
+
+    full_sample: NDArray
+    full_voltage: NDArray
+    index: int = 0
+    frequency: float | None = None
+    embedded_constants: tuple[float, float, float] = (np.nan, np.nan, np.nan)
+
+    def __str__(self) -> str:
+        """Print the current object."""
+        return f"{super().__str__()} (sweep #{self.index})"
+
+    def _frequency_from_filename(self) -> float:
+        """Get frequency in MHz, from the file name if it was not given."""
+        if self.frequency is not None:
+            return self.frequency
+        return super()._frequency_from_filename()
+
+    def _load_embedded_constants(self) -> tuple[float, float, float]:
+        """Give the constants already read from the log file."""
+        return self.embedded_constants
+
+    def _load(self, column_name: str = "NI9205_Arc2") -> None:
+        """Take the already loaded data."""
+        self._full_voltage = self.full_voltage
+        self._full_sample = self.full_sample
+        self._exclude_useless()
+        self._exclude_first_point_if_level_was_stuck_at_20dbm()
+
+
+@dataclass
+class ContinuousLog:
+    """Detect and fit all the sweeps of a single log file.
+
+    Parameters
+    ----------
+    filepath :
+        Log file, with the same columns as the single-sweep files.
+    rack_name :
+        Name of the rack, eg ``"E1"``.
+    frequencies_mhz :
+        Frequency of every successive sweep. If not provided, all sweeps are
+        considered to be at the frequency in the name of the file.
+    min_peak_voltage :
+        Voltage peaks below this value are not considered as sweeps.
+    chunksize :
+        Number of lines read at once.
+
+    """
+
+    filepath: Path
+    rack_name: str
+    frequencies_mhz: Sequence[float] | None = None
+    min_peak_voltage: float = 1.0
+    chunksize: int = 100_000
+    n_p_dbm_points: int = 37
+    column_name: str = "NI9205_Arc2"
+    sep: str = "\t"
+    decimal: str = ","
+
+    def _chunks(self) -> Iterator[tuple[NDArray, NDArray]]:
+        """Read the file block by block."""
+        import pandas as pd
+
+        reader = pd.read_csv(
+            self.filepath,
+            sep=self.sep,
+            decimal=self.decimal,
+            usecols=["Sample index", self.column_name],
+            chunksize=self.chunksize,
+        )
+        with reader:
+            for chunk in reader:
+                chunk = chunk.dropna()
+                yield (
+                    chunk["Sample index"].to_numpy(),
+                    chunk[self.column_name].to_numpy(dtype=float),
+                )
+
+    def _peaks(self, voltage: NDArray, is_last: bool) -> NDArray:
+        """Give position of the sweep ends in ``voltage``.
+
+        Peaks which right-hand window is not complete are not returned, unless
+        this is the last block of the file. Peaks too close to the start of
+        ``voltage`` to hold a full sweep are never returned.
+
+        """
+        half_width = self.n_p_dbm_points - 1
+        padded = np.pad(voltage, half_width, constant_values=-np.inf)
+        windows = sliding_window_view(padded, 2 * half_width + 1)
+        is_peak = windows.argmax(axis=1) == half_width
+        is_peak &= voltage >= self.min_peak_voltage
+        # Sweep would be incomplete
+        is_peak[: self.n_p_dbm_points - 1] = False
+        if not is_last:
+            is_peak[voltage.size - half_width :] = False
+        return np.flatnonzero(is_peak)
+
+    def segments(self) -> Iterator[LogSegment]:
+        """Yield every sweep of the file, loaded and fitted."""
+        half_width = self.n_p_dbm_points - 1
+        sample = np.empty(0, dtype=int)
+        voltage = np.empty(0, dtype=float)
+        # Position of the first sample that was not checked for peaks yet
+        first_unchecked = 0
+        index = 0
+        embedded_constants = load_embedded_constants(
+            self.filepath, self.rack_name, sep=self.sep, decimal=self.decimal
+        )
+
+        chunks = self._chunks()
+        chunk = next(chunks, None)
+        while chunk is not None:
+            next_chunk = next(chunks, None)
+            sample = np.concatenate((sample, chunk[0]))
+            voltage = np.concatenate((voltage, chunk[1]))
+
+            peaks = self._peaks(voltage, is_last=next_chunk is None)
+            for peak in peaks[peaks >= first_unchecked]:
+                # Previous and next sweeps are outside of this window, so
+                # the peak is also the maximum of the segment
+                window = slice(peak - half_width, peak + half_width + 1)
+                yield self._segment(
+                    sample[window], voltage[window], index, embedded_constants
+                )
+                index += 1
+
+            # Keep enough samples to rebuild the windows of the peaks in the
+            # last, unchecked, ``half_width`` samples
+            n_kept = min(3 * half_width, voltage.size)
+            first_unchecked = max(n_kept - half_width, 0)
+            sample = sample[-n_kept:] if n_kept else sample
+            voltage = voltage[-n_kept:] if n_kept else voltage
+            chunk = next_chunk
+
+    def _segment(
+        self,
+        sample: NDArray,
+        voltage: NDArray,
+        index: int,
+        embedded_constants: tuple[float, float, float],
+    ) -> LogSegment:
+        """Create and fit a single sweep."""
+        frequency = None
+        if self.frequencies_mhz is not None:
+            if index >= len(self.frequencies_mhz):
+                raise ValueError(
+                    f"More sweeps were found in {self.filepath} than the "
+                    f"{len(self.frequencies_mhz)} given frequencies."
+                )
+            frequency = float(self.frequencies_mhz[index])
+        return LogSegment(
+            filepath=self.filepath,
+            rack_name=self.rack_name,
+            n_p_dbm_points=self.n_p_dbm_points,
+            sep=self.sep,
+            decimal=self.decimal,
+            full_sample=sample,
+            full_voltage=voltage,
+            index=index,
+            frequency=frequency,
+            embedded_constants=embedded_constants,
+        )
+
+    def fitting_constants(self) -> NDArray:
+        """Fit all sweeps, only keeping their results.
+
+        Returns
+        -------
+        NDArray
+            One row per sweep: frequency in MHz, ``a``, ``b``, ``R²``.
+
+        """
+        return np.array(
+            [
+                (s.frequency_mhz, s.a_opti, s.b_opti, s.r_squared)
+                for s in self.segments()
+            ]
+        ).reshape(-1, 4)
@@ -0,0 +1,123 @@
+"""Fit the calibration constants of a rack as smooth functions of frequency.
+
+Instead of fitting every ``(rack, frequency)`` pair independently, we model:
+
+.. math::
+
+    P_{dBm}(V, f) = a(f) \\times V + b(f)
+
+where :math:`a(f)` and :math:`b(f)` are low-order Legendre polynomials of the
+frequency. All the sweeps of a rack are used in a single regularized linear
+least-squares solve.
+
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from multipac_testbench_calibrate_racks.single_measurement import Measurement
+from numpy.polynomial import legendre
+from numpy.typing import ArrayLike, NDArray
+
+
+@dataclass
+class FrequencySurface:
+    """Hold a joint fit of ``a`` and ``b`` over the frequency range of a rack.
+
+    Parameters
+    ----------
+    measurements :
+        All the sweeps of a single rack.
+    degree :
+        Degree of the Legendre polynomials modelling ``a(f)`` and ``b(f)``.
+        It is clipped to the number of distinct frequencies minus one.
+    regularization :
+        Ridge (Tikhonov) weight applied to the non-constant polynomial
+        coefficients. Keeps the fit well-behaved when few frequencies were
+        measured.
+
+    """
+
+    measurements: Sequence[Measurement]
+    degree: int = 2
+    regularization: float = 1e-6
+
+    def __post_init__(self) -> None:
+        """Auto fit."""
+        self.coeffs_a: NDArray
+        self.coeffs_b: NDArray
+        self.r_squared: float
+
+        frequencies = np.array([m.frequency_mhz for m in self.measurements])
+        if frequencies.size == 0:
+            raise ValueError("At least one measurement is needed.")
+        self.f_min_mhz = float(frequencies.min())
+        self.f_max_mhz = float(frequencies.max())
+        self.degree = min(self.degree, np.unique(frequencies).size - 1)
+
+        self._fit()
+
+    def __str__(self) -> str:
+        """Print the current object."""
+        rack_name = self.measurements[0].rack_name
+        return (
+            f"{rack_name} frequency surface, degree {self.degree}, "
+            f"{self.f_min_mhz:3.0f}-{self.f_max_mhz:3.0f}MHz"
+        )
+
+    def _normalized(self, frequency_mhz: ArrayLike) -> NDArray:
+        """Map frequency from ``[f_min, f_max]`` to ``[-1, 1]``."""
+        frequency_mhz = np.asarray(frequency_mhz, dtype=float)
+        span = self.f_max_mhz - self.f_min_mhz
+        if span == 0.0:
+            return np.zeros_like(frequency_mhz)
+        return (2.0 * frequency_mhz - self.f_max_mhz - self.f_min_mhz) / span
+
+    def _fit(self) -> None:
+        """Solve the joint least-squares problem."""
+        voltage = np.concatenate([m.voltage for m in self.measurements])
+        p_dbm = np.concatenate([m.p_dbm for m in self.measurements])
+        frequency_mhz = np.concatenate(
+            [
+                np.full(m.voltage.shape, m.frequency_mhz)
+                for m in self.measurements
+            ]
+        )
+
+        basis = legendre.legvander(
+            self._normalized(frequency_mhz), self.degree
+        )
+        design = np.hstack((basis * voltage[:, np.newaxis], basis))
+
+        n_coeffs = self.degree + 1
+        penalty = np.full(2 * n_coeffs, np.sqrt(self.regularization))
+        penalty[[0, n_coeffs]] = 0.0
+        design_reg = np.vstack((design, np.diag(penalty)))
+        p_dbm_reg = np.concatenate((p_dbm, np.zeros(2 * n_coeffs)))
+
+        coeffs, *_ = np.linalg.lstsq(design_reg, p_dbm_reg, rcond=None)
+        self.coeffs_a = coeffs[:n_coeffs]
+        self.coeffs_b = coeffs[n_coeffs:]
+
+        residuals = p_dbm - design @ coeffs
+        ss_res = np.sum(residuals**2)
+        ss_tot = np.sum((p_dbm - np.mean(p_dbm)) ** 2)
+        self.r_squared = 1.0 - (ss_res / ss_tot)
+
+    def a(self, frequency_mhz: ArrayLike) -> NDArray:
+        """Give fitting slope in dBm / V at given frequencies."""
+        return legendre.legval(self._normalized(frequency_mhz), self.coeffs_a)
+
+    def b(self, frequency_mhz: ArrayLike) -> NDArray:
+        """Give fitting offset in dBm at given frequencies."""
+        return legendre.legval(self._normalized(frequency_mhz), self.coeffs_b)
+
+    def __call__(self, frequency_mhz: ArrayLike) -> NDArray:
+        """Give ``a`` and ``b`` stacked like ``Rack.fitting_constants``."""
+        return np.vstack((self.a(frequency_mhz), self.b(frequency_mhz)))
+
+    def p_dbm(self, voltage: ArrayLike, frequency_mhz: ArrayLike) -> NDArray:
+        """Compute forward power in dBm at given voltage and frequency."""
+        voltage = np.asarray(voltage, dtype=float)
+        return self.a(frequency_mhz) * voltage + self.b(frequency_mhz)
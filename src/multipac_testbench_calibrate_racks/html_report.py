@@ -0,0 +1,276 @@
+"""Create a single, self-contained, HTML report of a calibration.
+
+Every plot is an inline SVG, so the report needs neither matplotlib nor any
+JavaScript library. Raw traces are decimated with a min/max scheme, so that
+the size of the report and the time to create it stay bounded whatever the
+number of raw samples.
+
+"""
+
+import html
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from multipac_testbench_calibrate_racks.rack import Rack
+from multipac_testbench_calibrate_racks.single_measurement import model
+from numpy.typing import NDArray
+
+#: Same as matplotlib default color cycle
+COLORS = (
+    "#1f77b4",
+    "#ff7f0e",
+    "#2ca02c",
+    "#d62728",
+    "#9467bd",
+    "#8c564b",
+    "#e377c2",
+    "#7f7f7f",
+    "#bcbd22",
+    "#17becf",
+)
+STYLE = """
+body { font-family: sans-serif; margin: 2em; }
+table { border-collapse: collapse; margin-bottom: 1em; }
+th, td { border: 1px solid #ccc; padding: 0.2em 0.6em; text-align: right; }
+tr.warning td { background: #fdd; }
+.plots { display: flex; flex-wrap: wrap; gap: 1em; }
+svg text { font-size: 11px; }
+svg polyline { fill: none; }
+svg polyline:hover { stroke-width: 4; }
+"""
+
+
+def minmax_decimate(
+    x: NDArray, y: NDArray, max_points: int
+) -> tuple[NDArray, NDArray]:
+    """Keep the min and max of ``y`` in ``max_points // 2`` buckets.
+
+    Envelope of the signal is preserved, as well as the order of the points.
+    Data is returned unchanged if it is already small enough.
+
+    """
+    n_buckets = max_points // 2
+    if x.size <= max_points or n_buckets == 0:
+        return x, y
+    bucket_size = -(-x.size // n_buckets)
+    n_padded = bucket_size * n_buckets
+    y_padded = np.pad(
+        y.astype(float), (0, n_padded - y.size), constant_values=np.nan
+    ).reshape(n_buckets, bucket_size)
+    valid = ~np.all(np.isnan(y_padded), axis=1)
+    y_padded, offsets = y_padded[valid], np.flatnonzero(valid) * bucket_size
+
+    idx_min = offsets + np.nanargmin(y_padded, axis=1)
+    idx_max = offsets + np.nanargmax(y_padded, axis=1)
+    idx = np.sort(np.stack((idx_min, idx_max), axis=1), axis=1).ravel()
+    return x[idx], y[idx]
+
+
+class _Chart:
+    """Build a simple SVG line chart."""
+
+    def __init__(
+        self,
+        x_label: str,
+        y_label: str,
+        width: int = 480,
+        height: int = 320,
+        margin: int = 50,
+    ) -> None:
+        """Create an empty chart."""
+        self.x_label = x_label
+        self.y_label = y_label
+        self.width = width
+        self.height = height
+        self.margin = margin
+        self._series: list[tuple[NDArray, NDArray, str, str]] = []
+
+    def add(self, x: NDArray, y: NDArray, label: str, attributes: str) -> None:
+        """Add a line; ``attributes`` are SVG attributes of the polyline."""
+        self._series.append((x, y, label, attributes))
+
+    def _limits(self, axis: int) -> tuple[float, float]:
+        """Give min and max of all series along ``axis``."""
+        values = np.concatenate([s[axis] for s in self._series])
+        values = values[np.isfinite(values)]
+        low, high = float(values.min()), float(values.max())
+        if low == high:
+            low, high = low - 1.0, high + 1.0
+        return low, high
+
+    def to_svg(self) -> str:
+        """Give the chart as an SVG element."""
+        if not self._series:
+            return ""
+        (x_min, x_max), (y_min, y_max) = self._limits(0), self._limits(1)
+        left, top = self.margin, 10
+        right, bottom = self.width - 10, self.height - self.margin
+
+        def _x(x: NDArray) -> NDArray:
+            return left + (x - x_min) / (x_max - x_min) * (right - left)
+
+        def _y(y: NDArray) -> NDArray:
+            return bottom - (y - y_min) / (y_max - y_min) * (bottom - top)
+
+        lines = [
+            f'<svg width="{self.width}" height="{self.height}" '
+            'xmlns="http://www.w3.org/2000/svg">',
+            f'<rect x="{left}" y="{top}" width="{right - left}" '
+            f'height="{bottom - top}" fill="none" stroke="#888"/>',
+        ]
+        for tick in np.linspace(x_min, x_max, 5):
+            lines.append(
+                f'<text x="{_x(tick):.1f}" y="{bottom + 15}" '
+                f'text-anchor="middle">{tick:.3g}</text>'
+            )
+        for tick in np.linspace(y_min, y_max, 5):
+            lines.append(
+                f'<text x="{left - 4}" y="{_y(tick):.1f}" '
+                f'text-anchor="end">{tick:.3g}</text>'
+            )
+        lines += [
+            f'<text x="{(left + right) / 2}" y="{self.height - 10}" '
+            f'text-anchor="middle">{html.escape(self.x_label)}</text>',
+            f'<text x="12" y="{(top + bottom) / 2}" text-anchor="middle" '
+            f'transform="rotate(-90 12 {(top + bottom) / 2})">'
+            f"{html.escape(self.y_label)}</text>",
+        ]
+        for x, y, label, attributes in self._series:
+            finite = np.isfinite(x) & np.isfinite(y)
+            points = " ".join(
+                f"{px:.1f},{py:.1f}"
+                for px, py in zip(_x(x[finite]), _y(y[finite]))
+            )
+            lines.append(
+                f'<polyline points="{points}" {attributes}>'
+                f"<title>{html.escape(label)}</title></polyline>"
+            )
+        lines.append("</svg>")
+        return "\n".join(lines)
+
+
+def _table(racks: Sequence[Rack], min_r_squared: float) -> str:
+    """Give the fit results of all racks as an HTML table."""
+    rows = [
+        "<table>",
+        "<tr><th>Rack</th><th>Frequency [MHz]</th><th>a [dBm / V]</th>"
+        "<th>b [dBm]</th><th>R²</th><th>Fitted points</th></tr>",
+    ]
+    for rack in racks:
+        for measurement in rack.measurements:
+            css = (
+                ' class="warning"'
+                if measurement.r_squared < min_r_squared
+                else ""
+            )
+            rows.append(
+                f"<tr{css}><td>{html.escape(rack.name)}</td>"
+                f"<td>{measurement.frequency_mhz:.0f}</td>"
+                f"<td>{measurement.a_opti:.4f}</td>"
+                f"<td>{measurement.b_opti:.4f}</td>"
+                f"<td>{measurement.r_squared:.5f}</td>"
+                f"<td>{measurement.voltage.size}</td></tr>"
+            )
+    rows.append("</table>")
+    return "\n".join(rows)
+
+
+def _rack_section(rack: Rack, max_points: int) -> str:
+    """Give the measured, fitted and residuals plots of a rack."""
+    measured = _Chart("Sample index", "Voltage [V]")
+    fit = _Chart("Measured voltage [V]", "RF power [dBm]")
+    residuals = _Chart("Measured voltage [V]", "Residuals [dBm]")
+
+    for i, measurement in enumerate(rack.measurements):
+        color = COLORS[i % len(COLORS)]
+        label = f"{measurement.frequency_mhz:.0f}MHz"
+        line = f'stroke="{color}" stroke-width="1"'
+        thick = f'stroke="{color}" stroke-width="5" stroke-opacity="0.4"'
+
+        measured.add(
+            *minmax_decimate(
+                measurement._full_sample,
+                measurement._full_voltage,
+                max_points,
+            ),
+            label=label,
+            attributes=line,
+        )
+        measured.add(
+            measurement._sample,
+            measurement.voltage,
+            label=f"{label}, for fit",
+            attributes=thick,
+        )
+
+        fitted = model(
+            measurement.voltage, measurement.a_opti, measurement.b_opti
+        )
+        fit.add(
+            measurement.voltage,
+            measurement.p_dbm,
+            label=label,
+            attributes=line,
+        )
+        fit.add(
+            measurement.voltage,
+            fitted,
+            label=f"{label}, a = {measurement.a_opti:3.2f}, "
+            f"b = {measurement.b_opti:3.2f}, "
+            f"R2 = {measurement.r_squared:3.4f}",
+            attributes=thick + ' stroke-dasharray="6 3"',
+        )
+        residuals.add(
+            measurement.voltage,
+            measurement.p_dbm - fitted,
+            label=label,
+            attributes=line,
+        )
+
+    return (
+        f"<details open><summary><h2>{html.escape(rack.name)}</h2></summary>"
+        '<div class="plots">'
+        f"{measured.to_svg()}{fit.to_svg()}{residuals.to_svg()}"
+        "</div></details>"
+    )
+
+
+def html_report(
+    racks: Sequence[Rack],
+    max_points: int = 2000,
+    min_r_squared: float = 0.999,
+) -> str:
+    """Create the HTML report of all racks.
+
+    Parameters
+    ----------
+    racks :
+        Racks to report, eg a :class:`.SetOfRacks`.
+    max_points :
+        Maximum number of points of every raw trace.
+    min_r_squared :
+        Fits with a lower R² are highlighted in the table.
+
+    """
+    body = [
+        "<h1>RF racks calibration</h1>",
+        f"<p>Created on {datetime.now()}. Hover on a line for its label.</p>",
+        _table(racks, min_r_squared),
+    ]
+    body += [_rack_section(rack, max_points) for rack in racks]
+    return (
+        "<!DOCTYPE html>\n<html><head><meta charset='utf-8'>"
+        "<title>RF racks calibration</title>"
+        f"<style>{STYLE}</style></head><body>\n"
+        + "\n".join(body)
+        + "\n</body></html>\n"
+    )
+
+
+def save_html_report(
+    racks: Sequence[Rack], filepath: Path, max_points: int = 2000
+) -> None:
+    """Write the HTML report of all racks to ``filepath``."""
+    filepath.write_text(html_report(racks, max_points), encoding="utf-8")
@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 """Evaluate the influence of calibration error on measured voltage."""
 
-import matplotlib.pyplot as plt
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
 import numpy as np
-import pandas as pd
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from matplotlib.axes import Axes
+    from multipac_testbench_calibrate_racks.rack import Rack
 
 
 def v_coax_from_acqui(
@@ -27,7 +34,7 @@ def error_study(
     b_rack: float = -51.74,
     g_probe: float = -77.2,
     v_acqui: NDArray | None = None,
-) -> pd.DataFrame:
+) -> "pd.DataFrame":
     """Compute error envelopes.
 
     Default values for ``a_rack``, ``b_rack``, ``g_probe`` are taken from E1
@@ -36,6 +43,8 @@ def error_study(
     All errors ``delta_`` must be given positive.
 
     """
+    import pandas as pd
+
     if v_acqui is None:
         v_acqui = np.linspace(0.0, 10.0, 1001)
     x_label = "Acquisition voltage [V]"
@@ -79,7 +88,169 @@ def error_study(
     return data
 
 
+@dataclass
+class Sensitivity:
+    """Hold relative error on coax voltage over a grid of parameters.
+
+    Parameters
+    ----------
+    values :
+        Relative error in %. Its number of dimensions is the length of
+        ``coords``.
+    coords :
+        Name of every dimension of ``values``, with the corresponding labels.
+
+    """
+
+    values: NDArray
+    coords: dict[str, NDArray]
+
+    def __post_init__(self) -> None:
+        """Check consistency of shapes."""
+        shape = tuple(len(labels) for labels in self.coords.values())
+        if self.values.shape != shape:
+            raise ValueError(
+                f"values shape {self.values.shape} does not match coords "
+                f"shape {shape}."
+            )
+
+    @property
+    def dims(self) -> tuple[str, ...]:
+        """Give name of every dimension."""
+        return tuple(self.coords)
+
+    def reduce(
+        self, dims: Sequence[str], func: Callable[..., NDArray] = np.max
+    ) -> "Sensitivity":
+        """Apply ``func`` (eg ``np.max``, ``np.mean``) along ``dims``."""
+        axis = tuple(self.dims.index(dim) for dim in dims)
+        coords = {
+            dim: labels
+            for dim, labels in self.coords.items()
+            if dim not in dims
+        }
+        return Sensitivity(func(self.values, axis=axis), coords)
+
+
+def constants_from_racks(
+    racks: Sequence["Rack"],
+) -> tuple[NDArray, NDArray, NDArray, NDArray]:
+    """Give nominal ``a``, ``b`` and ``g`` of every rack and frequency.
+
+    ``g`` is the probe attenuation stored in the acquisition files.
+
+    Returns
+    -------
+    labels :
+        ``"E1 @  80MHz"``-like label of every measurement.
+    a_rack, b_rack, g_probe :
+        Corresponding nominal constants.
+
+    """
+    measurements = [m for rack in racks for m in rack.measurements]
+    labels = np.array([str(m) for m in measurements])
+    a_rack = np.array([m.a_opti for m in measurements])
+    b_rack = np.array([m.b_opti for m in measurements])
+    g_probe = np.array([m.g_embedded for m in measurements])
+    return labels, a_rack, b_rack, g_probe
+
+
+def sensitivity_sweep(
+    delta_a_rack: ArrayLike,
+    delta_b_rack: ArrayLike,
+    delta_g_probe: ArrayLike = 0.0,
+    a_rack: ArrayLike = 10.30,
+    b_rack: ArrayLike = -51.74,
+    g_probe: ArrayLike = -77.2,
+    v_acqui: NDArray | None = None,
+    labels: ArrayLike | None = None,
+) -> Sensitivity:
+    """Compute error envelopes over a full grid of errors and constants.
+
+    This is the batched version of :func:`error_study`, without plotting.
+    ``a_rack``, ``b_rack`` and ``g_probe`` must have the same length, eg one
+    entry per rack and frequency as given by :func:`constants_from_racks`.
+
+    All errors ``delta_`` must be given positive.
+
+    Returns
+    -------
+    Sensitivity
+        Relative error in %, with dimensions ``("bound", "constants",
+        "delta_a_rack", "delta_b_rack", "delta_g_probe", "v_acqui")``.
+        ``bound`` is ``"min"`` or ``"max"``, as in :func:`error_study`.
+
+    """
+    if v_acqui is None:
+        v_acqui = np.linspace(0.0, 10.0, 1001)
+    a_rack, b_rack, g_probe = np.broadcast_arrays(
+        np.atleast_1d(a_rack), np.atleast_1d(b_rack), np.atleast_1d(g_probe)
+    )
+    if labels is None:
+        labels = np.arange(a_rack.size)
+    coords = {
+        "bound": np.array(["min", "max"]),
+        "constants": np.asarray(labels),
+        "delta_a_rack": np.atleast_1d(delta_a_rack).astype(float),
+        "delta_b_rack": np.atleast_1d(delta_b_rack).astype(float),
+        "delta_g_probe": np.atleast_1d(delta_g_probe).astype(float),
+        "v_acqui": np.asarray(v_acqui, dtype=float),
+    }
+
+    def _along(values: NDArray, axis: int) -> NDArray:
+        """Reshape 1D ``values`` to broadcast along ``axis`` of 5D grid."""
+        shape = [1] * 5
+        shape[axis] = values.size
+        return values.reshape(shape)
+
+    a_nom, b_nom, g_nom = (_along(x, 0) for x in (a_rack, b_rack, g_probe))
+    d_a = _along(coords["delta_a_rack"], 1)
+    d_b = _along(coords["delta_b_rack"], 2)
+    d_g = _along(coords["delta_g_probe"], 3)
+    v_acqui = _along(coords["v_acqui"], 4)
+
+    nominal = v_coax_from_acqui(v_acqui, a_nom, b_nom, g_nom)
+    mini = v_coax_from_acqui(v_acqui, a_nom - d_a, b_nom - d_b, g_nom + d_g)
+    maxi = v_coax_from_acqui(v_acqui, a_nom + d_a, b_nom + d_b, g_nom - d_g)
+    values = 100.0 * np.abs(np.stack((mini, maxi)) - nominal) / nominal
+    return Sensitivity(values, coords)
+
+
+def plot_sensitivity_map(
+    sensitivity: Sensitivity,
+    x: str = "delta_a_rack",
+    y: str = "delta_b_rack",
+    func: Callable[..., NDArray] = np.max,
+    axe: "Axes | None" = None,
+) -> "Axes":
+    """Plot relative error as a heat-map.
+
+    All dimensions but ``x`` and ``y`` are reduced with ``func``; with the
+    default, the map shows the worst error over all other parameters.
+
+    """
+    import matplotlib.pyplot as plt
+
+    others = [dim for dim in sensitivity.dims if dim not in (x, y)]
+    reduced = sensitivity.reduce(others, func)
+    values = reduced.values
+    if reduced.dims != (y, x):
+        values = values.T
+
+    if axe is None:
+        _, axe = plt.subplots()
+    mesh = axe.pcolormesh(
+        reduced.coords[x], reduced.coords[y], values, shading="nearest"
+    )
+    axe.figure.colorbar(mesh, ax=axe, label="Relative error [%]")
+    axe.set_xlabel(x)
+    axe.set_ylabel(y)
+    return axe
+
+
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
     error_study(
         delta_a_rack=2e-2,
         delta_b_rack=6e-1,
@@ -2,12 +2,13 @@
 """Treat all the rack data."""
 from pathlib import Path
 
-import matplotlib.pyplot as plt
 from multipac_testbench_calibrate_racks.set_of_racks import SetOfRacks
 
-plt.close("all")
-
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    plt.close("all")
+
     # Must contain all measurement files, in folders named "E1", "E2", etc
     base_folder = Path("../../data/measurements")
     out_folder = Path("../../data/results")
@@ -22,3 +23,6 @@ if __name__ == "__main__":
 
     # To save data
     all_racks.save_as_file()
+
+    # To gather data, fits and residuals of all racks in a single HTML file
+    all_racks.save_html_report()
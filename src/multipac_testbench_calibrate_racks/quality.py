@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Check the quality of the fits of a :class:`.SetOfRacks`.
+
+All the checks are vectorized over the fitted arrays of every rack and every
+frequency, so that they can gate every automated calibration run.
+
+Usage:
+
+.. code-block:: bash
+
+   python quality.py <base_folder> [--report report.json]
+
+Exit code is 1 if at least one check failed.
+
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+from multipac_testbench_calibrate_racks.rack import Rack
+from multipac_testbench_calibrate_racks.set_of_racks import SetOfRacks
+from numpy.typing import NDArray
+
+
+@dataclass
+class QualityThresholds:
+    """Hold the limits used by :func:`check_quality`.
+
+    Parameters
+    ----------
+    min_r_squared :
+        Minimum coefficient of determination of every fit.
+    max_abs_residual_dbm :
+        Maximum distance between a measure point and the fitted line, in dBm.
+    min_durbin_watson :
+        Minimum Durbin-Watson statistic of the residuals. Values close to 0
+        indicate strongly structured residuals, ie a non-linear response.
+    max_robust_z :
+        Maximum robust z-score of ``a`` and ``b`` with respect to the other
+        racks at the same frequency.
+    min_scale_a :
+        Lower bound of the spread of ``a`` between racks, in dBm / V. Avoids
+        flagging tiny deviations when all racks are almost identical.
+    min_scale_b :
+        Lower bound of the spread of ``b`` between racks, in dBm.
+    max_delta_a_embedded :
+        Maximum difference between fitted ``a`` and the ``a`` stored in the
+        acquisition file, in dBm / V.
+    max_delta_b_embedded :
+        Maximum difference between fitted ``b`` and the ``b`` stored in the
+        acquisition file, in dBm.
+
+    """
+
+    min_r_squared: float = 0.999
+    max_abs_residual_dbm: float = 1.0
+    min_durbin_watson: float = 0.1
+    max_robust_z: float = 5.0
+    min_scale_a: float = 1e-2
+    min_scale_b: float = 5e-2
+    max_delta_a_embedded: float = 0.2
+    max_delta_b_embedded: float = 1.0
+
+
+def fitted_arrays(racks: Sequence[Rack]) -> dict[str, NDArray]:
+    """Gather fit results of all racks in flat arrays.
+
+    Every array has one entry per measurement, except ``voltage`` and
+    ``p_dbm`` which are padded with NaN to the longest measurement.
+
+    """
+    measurements = [m for rack in racks for m in rack.measurements]
+    n_points = max(m.voltage.size for m in measurements)
+    voltage = np.full((len(measurements), n_points), np.nan)
+    p_dbm = np.full((len(measurements), n_points), np.nan)
+    for i, measurement in enumerate(measurements):
+        voltage[i, : measurement.voltage.size] = measurement.voltage
+        p_dbm[i, : measurement.p_dbm.size] = measurement.p_dbm
+
+    def _get(attribute: str) -> NDArray:
+        return np.array([getattr(m, attribute) for m in measurements])
+
+    arrays = {
+        "rack": _get("rack_name"),
+        "frequency_mhz": _get("frequency_mhz"),
+        "a": _get("a_opti"),
+        "b": _get("b_opti"),
+        "r_squared": _get("r_squared"),
+        "a_embedded": _get("a_embedded"),
+        "b_embedded": _get("b_embedded"),
+        "voltage": voltage,
+        "p_dbm": p_dbm,
+    }
+    return arrays
+
+
+def _robust_z(
+    values: NDArray,
+    rack_idx: NDArray,
+    freq_idx: NDArray,
+    min_scale: float,
+) -> NDArray:
+    """Compute z-score of every value w.r.t. other racks at same frequency."""
+    grid = np.full((rack_idx.max() + 1, freq_idx.max() + 1), np.nan)
+    grid[rack_idx, freq_idx] = values
+    median = np.nanmedian(grid, axis=0)
+    mad = np.nanmedian(np.abs(grid - median), axis=0)
+    scale = np.maximum(1.4826 * mad, min_scale)
+    return (values - median[freq_idx]) / scale[freq_idx]
+
+
+def compute_metrics(
+    arrays: dict[str, NDArray], thresholds: QualityThresholds
+) -> dict[str, NDArray]:
+    """Compute all quality metrics, one value per measurement."""
+    a, b = arrays["a"], arrays["b"]
+    residuals = arrays["p_dbm"] - (
+        a[:, np.newaxis] * arrays["voltage"] + b[:, np.newaxis]
+    )
+    durbin_watson = np.nansum(np.diff(residuals, axis=1) ** 2, axis=1)
+    durbin_watson /= np.nansum(residuals**2, axis=1)
+
+    _, rack_idx = np.unique(arrays["rack"], return_inverse=True)
+    _, freq_idx = np.unique(arrays["frequency_mhz"], return_inverse=True)
+
+    metrics = {
+        "r_squared": arrays["r_squared"],
+        "max_abs_residual_dbm": np.nanmax(np.abs(residuals), axis=1),
+        "durbin_watson": durbin_watson,
+        "robust_z_a": np.abs(
+            _robust_z(a, rack_idx, freq_idx, thresholds.min_scale_a)
+        ),
+        "robust_z_b": np.abs(
+            _robust_z(b, rack_idx, freq_idx, thresholds.min_scale_b)
+        ),
+        "delta_a_embedded": np.abs(a - arrays["a_embedded"]),
+        "delta_b_embedded": np.abs(b - arrays["b_embedded"]),
+    }
+    return metrics
+
+
+def check_quality(
+    racks: Sequence[Rack], thresholds: QualityThresholds | None = None
+) -> dict:
+    """Check all fits, return a JSON-serializable report."""
+    if thresholds is None:
+        thresholds = QualityThresholds()
+    arrays = fitted_arrays(racks)
+    metrics = compute_metrics(arrays, thresholds)
+
+    # metric name: (threshold, True if metric must be above threshold)
+    limits = {
+        "r_squared": (thresholds.min_r_squared, True),
+        "max_abs_residual_dbm": (thresholds.max_abs_residual_dbm, False),
+        "durbin_watson": (thresholds.min_durbin_watson, True),
+        "robust_z_a": (thresholds.max_robust_z, False),
+        "robust_z_b": (thresholds.max_robust_z, False),
+        "delta_a_embedded": (thresholds.max_delta_a_embedded, False),
+        "delta_b_embedded": (thresholds.max_delta_b_embedded, False),
+    }
+    issues = []
+    for name, (threshold, is_min) in limits.items():
+        values = metrics[name]
+        # NaN (eg missing embedded constants) never fails
+        failed = values < threshold if is_min else values > threshold
+        for i in np.flatnonzero(failed):
+            issues.append(
+                {
+                    "rack": str(arrays["rack"][i]),
+                    "frequency_mhz": float(arrays["frequency_mhz"][i]),
+                    "check": name,
+                    "value": float(values[i]),
+                    "threshold": threshold,
+                }
+            )
+
+    measurements = [
+        {
+            "rack": str(arrays["rack"][i]),
+            "frequency_mhz": float(arrays["frequency_mhz"][i]),
+            "a": float(arrays["a"][i]),
+            "b": float(arrays["b"][i]),
+        }
+        | {name: _to_json(metrics[name][i]) for name in limits}
+        for i in range(arrays["a"].size)
+    ]
+    report = {
+        "passed": not issues,
+        "thresholds": asdict(thresholds),
+        "issues": issues,
+        "measurements": measurements,
+    }
+    return report
+
+
+def _to_json(value: float) -> float | None:
+    """Convert NaN to None, as NaN is not valid JSON."""
+    value = float(value)
+    if np.isnan(value):
+        return None
+    return value
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Load and fit all racks, check them, return an exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base_folder", type=Path)
+    parser.add_argument(
+        "--report", type=Path, help="JSON output file. Default: stdout."
+    )
+    args = parser.parse_args(argv)
+
+    # Only the report may go to stdout, so that it can be piped
+    with contextlib.redirect_stdout(sys.stderr):
+        racks = SetOfRacks(args.base_folder, out_folder=Path("."))
+    report = check_quality(racks)
+    text = json.dumps(report, indent=2)
+    if args.report is None:
+        print(text)
+    else:
+        args.report.write_text(text, encoding="utf-8")
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,8 +5,10 @@ from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
-import matplotlib.pyplot as plt
 import numpy as np
+from multipac_testbench_calibrate_racks.frequency_surface import (
+    FrequencySurface,
+)
 from multipac_testbench_calibrate_racks.helper import printc
 from multipac_testbench_calibrate_racks.single_measurement import Measurement
 from numpy.typing import NDArray
@@ -26,6 +28,7 @@ class Rack:
         """Auto load and fit."""
         self.fitting_constants: NDArray
         self.measurements: list[Measurement]
+        self.frequency_surface: FrequencySurface
 
         self._number = int(self.name[1])
 
@@ -55,8 +58,33 @@ class Rack:
         fitting_constants = np.vstack((a_opti, b_opti))
         return fitting_constants
 
+    def fit_frequency_surface(
+        self, degree: int = 2, regularization: float = 1e-6
+    ) -> FrequencySurface:
+        """Jointly fit ``a`` and ``b`` as smooth functions of frequency.
+
+        Parameters
+        ----------
+        degree :
+            Degree of the polynomials modelling ``a(f)`` and ``b(f)``.
+        regularization :
+            Ridge weight on the non-constant polynomial coefficients.
+
+        Returns
+        -------
+        FrequencySurface
+            Object that evaluates ``a`` and ``b`` at any frequency.
+
+        """
+        self.frequency_surface = FrequencySurface(
+            self.measurements, degree=degree, regularization=regularization
+        )
+        return self.frequency_surface
+
     def plot_as_measured(self, save_fig: bool = True) -> None:
         """Plot measured voltage, what was taken for fit."""
+        import matplotlib.pyplot as plt
+
         fignum = self._number * 10
         fig = plt.figure(fignum)
         axe = fig.add_subplot(111)
@@ -76,6 +104,8 @@ class Rack:
 
     def plot_fit(self, save_fig: bool = True) -> None:
         """Plot the fit results."""
+        import matplotlib.pyplot as plt
+
         fignum = self._number * 10 + 1
         fig = plt.figure(fignum)
         axe = fig.add_subplot(111)
@@ -98,16 +128,21 @@ class Rack:
 
         Rack | Freq [MHz] | a | b
 
+        The file is written under a temporary name and then renamed, so that
+        it is never read while partially written.
+
         """
         wrote_header = False
         filepath = Path(self.out_folder, f"{self.name}_fit_calibration.csv")
-        with open(filepath, "w", encoding="utf-8") as f:
+        tmp_filepath = filepath.with_name(f".{filepath.name}.tmp")
+        with open(tmp_filepath, "w", encoding="utf-8") as f:
             for measurement in self.measurements:
                 if not wrote_header:
                     f.write(Rack._header_for_file())
                     f.write(measurement.to_write(delimiter, header=True))
                     wrote_header = True
                 f.write(measurement.to_write(delimiter))
+        os.replace(tmp_filepath, filepath)
 
     @classmethod
     def _header_for_file(cls) -> str:
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""Serve the calibration constants over HTTP, on the local machine.
+
+Constants are read from the ``*_fit_calibration.csv`` files created by
+:meth:`.SetOfRacks.save_as_file`. The folder is polled, and the constants are
+swapped in a single assignment when a file is saved, so that requests are
+never served with half-updated constants.
+
+Usage:
+
+.. code-block:: bash
+
+   python server.py <out_folder> [--port 8765]
+
+Endpoints:
+
+``GET /constants``
+    All constants, as JSON.
+``GET /constants?rack=E1&frequency=120``
+    ``a`` and ``b`` of a rack, linearly interpolated between the calibrated
+    frequencies.
+``POST /convert?rack=E1&frequency=120[&unit=W]``
+    Convert acquisition voltages to RF power in dBm (default) or W. Body is a
+    JSON list of voltages, or raw little-endian float64 if the
+    ``Content-Type`` is ``application/octet-stream``. The response is raw
+    float64 if the ``Accept`` header is ``application/octet-stream``, JSON
+    otherwise.
+
+Connections are kept alive between requests (HTTP/1.1).
+
+"""
+
+import argparse
+import json
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from multipac_testbench_calibrate_racks.helper import printc
+from multipac_testbench_calibrate_racks.single_measurement import model
+from numpy.typing import NDArray
+
+#: Frequencies in MHz, ``a``, ``b``; sorted by frequency
+RackConstants = tuple[NDArray, NDArray, NDArray]
+BINARY = "application/octet-stream"
+
+
+def read_calibration_file(
+    filepath: Path, delimiter: str = "\t"
+) -> dict[str, RackConstants]:
+    """Read a file created by :meth:`.Rack.save_as_file`."""
+    rows: dict[str, list[tuple[float, float, float]]] = {}
+    with open(filepath, encoding="utf-8") as file:
+        lines = [line for line in file if not line.startswith("#")]
+    for line in lines[1:]:
+        if not line.strip():
+            continue
+        rack, frequency, a, b = line.rstrip("\n").split(delimiter)
+        rows.setdefault(rack, []).append(
+            (float(frequency), float(a), float(b))
+        )
+    constants = {}
+    for rack, values in rows.items():
+        frequency_mhz, a, b = np.array(sorted(values)).T
+        constants[rack] = (frequency_mhz, a, b)
+    return constants
+
+
+class CalibrationStore:
+    """Hold the constants of all racks, reload them when files change."""
+
+    def __init__(
+        self, out_folder: Path, pattern: str = "*_fit_calibration.csv"
+    ) -> None:
+        """Load all constants from ``out_folder``."""
+        self.out_folder = out_folder
+        self.pattern = pattern
+        self.constants: dict[str, RackConstants] = {}
+        self._signatures: dict[Path, tuple[int, int]] = {}
+        self.reload()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        """Give modification time and size of every calibration file."""
+        signatures = {}
+        for filepath in self.out_folder.glob(self.pattern):
+            try:
+                stat = filepath.stat()
+            except FileNotFoundError:
+                continue
+            signatures[filepath] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def reload(self) -> bool:
+        """Reload constants if a file changed, tell if they were reloaded."""
+        signatures = self._scan()
+        if signatures == self._signatures:
+            return False
+        constants = {}
+        try:
+            for filepath in sorted(signatures):
+                constants |= read_calibration_file(filepath)
+        except (OSError, ValueError) as error:
+            printc(f"Keeping previous constants, reload failed: {error}")
+            return False
+        # Single assignment: readers see either old or new constants
+        self.constants = constants
+        self._signatures = signatures
+        printc(f"Loaded constants of {sorted(constants)}", color="green")
+        return True
+
+    def watch(self, stop: threading.Event, poll_interval: float = 1.0) -> None:
+        """Reload constants every ``poll_interval`` until ``stop`` is set."""
+        while not stop.wait(poll_interval):
+            try:
+                self.reload()
+            except Exception as error:
+                # One failed poll must not stop hot reload for good
+                printc(f"Reload of constants failed: {error}")
+
+    def lookup(self, rack: str, frequency_mhz: float) -> tuple[float, float]:
+        """Give ``a`` and ``b``, interpolated at ``frequency_mhz``."""
+        constants = self.constants
+        if rack not in constants:
+            raise ValueError(f"Unknown rack {rack}.")
+        frequencies, a, b = constants[rack]
+        if not frequencies[0] <= frequency_mhz <= frequencies[-1]:
+            raise ValueError(
+                f"{frequency_mhz}MHz is outside of the {rack} calibration "
+                f"range [{frequencies[0]}, {frequencies[-1]}]MHz."
+            )
+        return (
+            float(np.interp(frequency_mhz, frequencies, a)),
+            float(np.interp(frequency_mhz, frequencies, b)),
+        )
+
+    def to_json(self) -> dict[str, list[dict[str, float]]]:
+        """Give all constants in a JSON-serializable format."""
+        return {
+            rack: [
+                {"frequency_mhz": float(f), "a": float(a), "b": float(b)}
+                for f, a, b in zip(*values)
+            ]
+            for rack, values in self.constants.items()
+        }
+
+
+class CalibrationHandler(BaseHTTPRequestHandler):
+    """Answer the requests, see module documentation."""
+
+    protocol_version = "HTTP/1.1"
+    server: "CalibrationServer"
+
+    def log_message(self, format: str, *args) -> None:
+        """Do not print every request."""
+
+    def _send(
+        self,
+        body: bytes,
+        content_type: str = "application/json",
+        status: HTTPStatus = HTTPStatus.OK,
+    ) -> None:
+        """Send a complete response."""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(
+        self, content: object, status: HTTPStatus = HTTPStatus.OK
+    ) -> None:
+        """Send ``content`` as JSON."""
+        self._send(json.dumps(content).encode(), status=status)
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        """Send an error as JSON."""
+        self._send_json({"error": message}, status=status)
+
+    def _query(self) -> tuple[str, dict[str, str]]:
+        """Give path and query parameters of the request."""
+        url = urlparse(self.path)
+        query = {
+            key: values[-1] for key, values in parse_qs(url.query).items()
+        }
+        return url.path, query
+
+    def _constants(self, query: dict[str, str]) -> tuple[float, float]:
+        """Give ``a`` and ``b`` asked in ``query``."""
+        if "rack" not in query or "frequency" not in query:
+            raise ValueError("Parameters rack and frequency are mandatory.")
+        return self.server.store.lookup(
+            query["rack"], float(query["frequency"])
+        )
+
+    def do_GET(self) -> None:
+        """Give constants."""
+        path, query = self._query()
+        if path != "/constants":
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path {path}.")
+            return
+        if not query:
+            self._send_json(self.server.store.to_json())
+            return
+        try:
+            a, b = self._constants(query)
+        except ValueError as error:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(error))
+            return
+        self._send_json({"a": a, "b": b})
+
+    def do_POST(self) -> None:
+        """Convert voltages to RF power."""
+        path, query = self._query()
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length < 0:
+                raise ValueError(f"Negative Content-Length {length}.")
+        except ValueError as error:
+            # Body cannot be skipped, so connection cannot be reused
+            self.close_connection = True
+            self._send_error(HTTPStatus.BAD_REQUEST, str(error))
+            return
+        body = self.rfile.read(length)
+        if path != "/convert":
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path {path}.")
+            return
+        try:
+            a, b = self._constants(query)
+        except ValueError as error:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(error))
+            return
+
+        try:
+            if self.headers.get("Content-Type") == BINARY:
+                voltage = np.frombuffer(body, dtype="<f8")
+            else:
+                voltage = np.asarray(json.loads(body), dtype=float)
+            if voltage.ndim != 1:
+                raise ValueError("Body must be a flat list of voltages.")
+            # NaN and infinity are not valid JSON
+            if not np.isfinite(voltage).all():
+                raise ValueError("Voltages must be finite.")
+        except (TypeError, ValueError) as error:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(error))
+            return
+
+        power = model(voltage, a, b)
+        if query.get("unit", "dBm").lower() == "w":
+            with np.errstate(over="ignore"):
+                power = np.power(10.0, (power - 30.0) / 10.0)
+        if not np.isfinite(power).all():
+            self._send_error(HTTPStatus.BAD_REQUEST, "Power is out of range.")
+            return
+
+        if self.headers.get("Accept") == BINARY:
+            self._send(power.astype("<f8").tobytes(), content_type=BINARY)
+            return
+        self._send_json(power.tolist())
+
+
+class CalibrationServer(ThreadingHTTPServer):
+    """Serve the constants of a :class:`CalibrationStore`."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        store: CalibrationStore,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+    ) -> None:
+        """Bind the server, do not start it yet."""
+        self.store = store
+        super().__init__((host, port), CalibrationHandler)
+
+
+def serve(
+    out_folder: Path,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    poll_interval: float = 1.0,
+) -> None:
+    """Serve constants from ``out_folder`` until interrupted."""
+    store = CalibrationStore(out_folder)
+    stop = threading.Event()
+    watcher = threading.Thread(
+        target=store.watch, args=(stop, poll_interval), daemon=True
+    )
+    watcher.start()
+    with CalibrationServer(store, host, port) as server:
+        printc(f"Serving calibration on http://{host}:{port}", color="cyan")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_folder", type=Path)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    serve(args.out_folder, args.host, args.port)
@@ -2,6 +2,7 @@
 
 from pathlib import Path
 
+from multipac_testbench_calibrate_racks.html_report import save_html_report
 from multipac_testbench_calibrate_racks.rack import Rack
 
 
@@ -33,6 +34,7 @@ class SetOfRacks(list):
                 └── MesureE7-88MHz.txt
 
         """
+        self.out_folder = out_folder.absolute()
         folders = [x for x in base_folder.iterdir() if x.is_dir()]
 
         racks = [
@@ -60,3 +62,11 @@ class SetOfRacks(list):
         """Save the fitting parameters."""
         for rack in self:
             rack.save_as_file(delimiter=delimiter)
+
+    def save_html_report(self, max_points: int = 2000) -> None:
+        """Save all data and fits in a single HTML file."""
+        save_html_report(
+            self,
+            Path(self.out_folder, "calibration_report.html"),
+            max_points=max_points,
+        )
@@ -2,13 +2,14 @@
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import numpy as np
-import pandas as pd
-from matplotlib.axes._axes import Axes
 from multipac_testbench_calibrate_racks.helper import printc
 from numpy.typing import NDArray
-from scipy.optimize import curve_fit
+
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
 
 
 def model(xdata: NDArray, a: float, b: float) -> np.ndarray:
@@ -33,6 +34,43 @@ def model(xdata: NDArray, a: float, b: float) -> np.ndarray:
     return ydata
 
 
+def load_embedded_constants(
+    filepath: Path,
+    rack_name: str,
+    sep: str = "\t",
+    decimal: str = ",",
+    key_column: str = "Folder :",
+) -> tuple[float, float, float]:
+    """Read the constants used by acquisition software for a rack.
+
+    They are stored as ``key: value`` pairs in the last two columns of the
+    file, eg ``E1 a:`` and ``10,30171``.
+
+    Returns
+    -------
+    tuple[float, float, float]
+        ``a``, ``b`` and the probe attenuation ``g``. NaN is returned for the
+        constants that are not found.
+
+    """
+    keys = {f"{rack_name} a:": 0, f"{rack_name} b:": 1, f"{rack_name} att:": 2}
+    constants = [np.nan, np.nan, np.nan]
+    with open(filepath, encoding="utf-8") as file:
+        header = file.readline().rstrip("\n").split(sep)
+        if key_column not in header:
+            return constants[0], constants[1], constants[2]
+        idx = header.index(key_column)
+        for line in file:
+            cells = line.rstrip("\n").split(sep)
+            if len(cells) <= idx + 1 or cells[idx] not in keys:
+                continue
+            value = cells[idx + 1].replace(decimal, ".")
+            constants[keys.pop(cells[idx])] = float(value)
+            if not keys:
+                break
+    return constants[0], constants[1], constants[2]
+
+
 @dataclass
 class Measurement:
     """Hold measured voltage for a power ramp at given frequency and rack."""
@@ -63,6 +101,9 @@ class Measurement:
 
         self._load()
         self.a_opti, self.b_opti, self.r_squared = self.fit()
+        self.a_embedded, self.b_embedded, self.g_embedded = (
+            self._load_embedded_constants()
+        )
 
     def __str__(self) -> str:
         """Print the current object."""
@@ -109,6 +150,8 @@ class Measurement:
 
     def _load(self, column_name: str = "NI9205_Arc2") -> None:
         """Load the file."""
+        import pandas as pd
+
         printc(f"Loading {self.frequency_mhz}")
         data = pd.read_csv(
             self.filepath,
@@ -121,6 +164,12 @@ class Measurement:
         self._exclude_useless()
         self._exclude_first_point_if_level_was_stuck_at_20dbm()
 
+    def _load_embedded_constants(self) -> tuple[float, float, float]:
+        """Read the constants used by acquisition software for this rack."""
+        return load_embedded_constants(
+            self.filepath, self.rack_name, sep=self.sep, decimal=self.decimal
+        )
+
     def _exclude_useless(self) -> None:
         """Exclude data that is not interesting."""
         indexes_to_keep = self._useful_indexes()
@@ -161,6 +210,8 @@ class Measurement:
 
     def fit(self) -> tuple[float, float, float]:
         """Perform the fit."""
+        from scipy.optimize import curve_fit
+
         xdata, ydata = self.voltage, self.p_dbm
         popt, _ = curve_fit(model, xdata=xdata, ydata=ydata)
         a_opti, b_opti = popt
@@ -170,7 +221,7 @@ class Measurement:
         r_squared = 1.0 - (ss_res / ss_tot)
         return a_opti, b_opti, r_squared
 
-    def plot_fit(self, axe: Axes) -> None:
+    def plot_fit(self, axe: "Axes") -> None:
         """Plot data."""
         (line1,) = axe.plot(
             self.voltage,
@@ -189,7 +240,7 @@ class Measurement:
             lw=7.0,
         )
 
-    def plot_as_measured(self, axe: Axes) -> None:
+    def plot_as_measured(self, axe: "Axes") -> None:
         """Plot what was measured."""
         (line1,) = axe.plot(
             self._full_sample,
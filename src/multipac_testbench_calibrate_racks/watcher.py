@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Watch the measurement folder and recalibrate racks when files change.
+
+The watcher polls the file system, so it does not rely on any OS-specific
+notification API. A measurement file is considered complete once its size and
+modification time did not change for ``debounce`` seconds; only then is the
+corresponding rack reloaded, fitted and saved, on a worker pool so that the
+acquisition is never blocked.
+
+"""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from multipac_testbench_calibrate_racks.helper import printc
+from multipac_testbench_calibrate_racks.rack import Rack
+
+#: Identifies a version of a file: ``(modification time in ns, size)``
+FileSignature = tuple[int, int]
+
+
+def calibrate_rack(
+    folder: Path, out_folder: Path, sep: str = "\t", decimal: str = ","
+) -> Rack:
+    """Load, fit and save the calibration of a single rack."""
+    rack = Rack(
+        name=folder.name,
+        folder=folder.absolute(),
+        out_folder=out_folder.absolute(),
+        sep=sep,
+        decimal=decimal,
+    )
+    rack.save_as_file()
+    return rack
+
+
+@dataclass
+class CalibrationWatcher:
+    """Recalibrate the racks which measurement files were created/modified.
+
+    Parameters
+    ----------
+    base_folder :
+        Folder holding one sub-folder per rack, same structure as expected by
+        :class:`.SetOfRacks`.
+    out_folder :
+        Where calibration files are saved.
+    poll_interval :
+        Time between two scans of ``base_folder``, in seconds.
+    debounce :
+        A rack is recalibrated only when none of its files changed for this
+        duration, in seconds. Prevents loading partially written files.
+    max_workers :
+        Number of racks that can be recalibrated simultaneously.
+    pattern :
+        Glob pattern of the measurement files, in every rack folder.
+    calibrate_on_start :
+        If True, all racks are calibrated at first scan. Otherwise, first scan
+        is only used as a reference.
+
+    """
+
+    base_folder: Path
+    out_folder: Path
+    poll_interval: float = 1.0
+    debounce: float = 2.0
+    max_workers: int = 2
+    pattern: str = "MesureE*-*.txt"
+    calibrate_on_start: bool = False
+    sep: str = "\t"
+    decimal: str = ","
+
+    def __post_init__(self) -> None:
+        """Set the watcher state."""
+        self._signatures: dict[Path, FileSignature] = {}
+        #: Rack folders that changed, with ``loop.time()`` of last change
+        self._dirty: dict[Path, float] = {}
+        self._running: dict[Path, asyncio.Task] = {}
+
+    def scan(self) -> dict[Path, FileSignature]:
+        """Give signature of every measurement file under ``base_folder``."""
+        signatures = {}
+        for filepath in self.base_folder.glob(f"*/{self.pattern}"):
+            try:
+                stat = filepath.stat()
+            except FileNotFoundError:
+                continue
+            signatures[filepath] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def _update(self, now: float) -> None:
+        """Scan files, mark the racks which files changed as dirty."""
+        signatures = self.scan()
+        changed = {
+            filepath
+            for filepath in signatures.keys() | self._signatures.keys()
+            if signatures.get(filepath) != self._signatures.get(filepath)
+        }
+        for filepath in changed:
+            self._dirty[filepath.parent] = now
+        self._signatures = signatures
+
+    def _ready(self, now: float) -> list[Path]:
+        """Give the dirty racks that are stable and not being processed."""
+        ready = [
+            folder
+            for folder, last_change in self._dirty.items()
+            if now - last_change >= self.debounce
+            and folder not in self._running
+        ]
+        for folder in ready:
+            del self._dirty[folder]
+        return ready
+
+    async def _recalibrate(self, folder: Path, executor: Executor) -> None:
+        """Recalibrate a single rack on the worker pool."""
+        loop = asyncio.get_running_loop()
+        printc(f"Recalibrating {folder.name}", color="cyan")
+        try:
+            await loop.run_in_executor(
+                executor,
+                calibrate_rack,
+                folder,
+                self.out_folder,
+                self.sep,
+                self.decimal,
+            )
+        except Exception as error:
+            printc(f"Calibration of {folder.name} failed: {error}")
+        else:
+            printc(f"Saved calibration of {folder.name}", color="green")
+        finally:
+            del self._running[folder]
+
+    async def run(self, stop: asyncio.Event | None = None) -> None:
+        """Poll ``base_folder`` until ``stop`` is set."""
+        if stop is None:
+            stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        self._signatures = self.scan()
+        if self.calibrate_on_start:
+            now = loop.time() - self.debounce
+            self._dirty = {f.parent: now for f in self._signatures}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while not stop.is_set():
+                now = loop.time()
+                self._update(now)
+                for folder in self._ready(now):
+                    self._running[folder] = asyncio.create_task(
+                        self._recalibrate(folder, executor)
+                    )
+                try:
+                    await asyncio.wait_for(
+                        stop.wait(), timeout=self.poll_interval
+                    )
+                except TimeoutError:
+                    pass
+            if self._running:
+                await asyncio.gather(*self._running.values())
+
+
+if __name__ == "__main__":
+    base_folder = Path("../../data/measurements")
+    out_folder = Path("../../data/results")
+    watcher = CalibrationWatcher(base_folder, out_folder)
+    try:
+        asyncio.run(watcher.run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,75 @@
+"""Check that importing the package stays fast.
+
+Every module is imported in a fresh interpreter with ``python -X importtime``.
+A check fails if a heavy dependency is imported at module load, or if the
+cumulative import time exceeds the budget.
+
+"""
+
+import pkgutil
+import subprocess
+import sys
+from importlib.util import find_spec
+
+PACKAGE = "multipac_testbench_calibrate_racks"
+#: Only imported on the code paths that use them
+HEAVY_DEPENDENCIES = ("matplotlib", "pandas", "scipy")
+DEFAULT_BUDGET_MS = 300.0
+
+
+def modules(package: str = PACKAGE) -> list[str]:
+    """Give the full name of every module of ``package``, without importing."""
+    spec = find_spec(package)
+    if spec is None or spec.submodule_search_locations is None:
+        raise ModuleNotFoundError(f"No package named {package}.")
+    return sorted(
+        f"{package}.{info.name}"
+        for info in pkgutil.iter_modules(spec.submodule_search_locations)
+    )
+
+
+def import_times(module: str) -> dict[str, float]:
+    """Import ``module`` in a new interpreter, give cumulative times in ms.
+
+    Returns
+    -------
+    dict[str, float]
+        Keys are the names of all the imported modules, values are the
+        cumulative time spent importing them and their dependencies.
+
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        times[name.strip()] = 1e-3 * float(cumulative)
+    return times
+
+
+def check(module: str, budget_ms: float | None = None) -> list[str]:
+    """Give the reasons why import of ``module`` is too slow.
+
+    The import time is only checked if ``budget_ms`` is given, as it depends
+    on the machine.
+
+    """
+    times = import_times(module)
+    errors = [
+        f"{module} imports {name}"
+        for name in HEAVY_DEPENDENCIES
+        if name in times
+    ]
+    total = times.get(module, 0.0)
+    print(f"{module:<70} {total:8.1f} ms")
+    if budget_ms is not None and total > budget_ms:
+        errors.append(f"{module} import takes {total:.1f} > {budget_ms} ms")
+    return errors
@@ -0,0 +1,206 @@
+"""Compare optimized pipelines with the reference one.
+
+The reference pipeline is :class:`.SetOfRacks`, which loads every file with
+``pd.read_csv`` and fits it with ``curve_fit``. Every candidate pipeline must
+give the same ``a``, ``b``, ``R²`` within tolerances, and select the same
+samples for the fit.
+
+"""
+
+import tempfile
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from multipac_testbench_calibrate_racks.continuous_log import ContinuousLog
+from multipac_testbench_calibrate_racks.set_of_racks import SetOfRacks
+from multipac_testbench_calibrate_racks.single_measurement import Measurement
+from numpy.typing import NDArray
+
+BUNDLED = Path(__file__).parents[2] / "data" / "measurements"
+
+
+@dataclass(frozen=True)
+class FitResult:
+    """Hold what a pipeline must give for a single sweep."""
+
+    rack: str
+    frequency_mhz: float
+    a: float
+    b: float
+    r_squared: float
+    sample: NDArray
+
+    @classmethod
+    def from_measurement(cls, measurement: Measurement) -> "FitResult":
+        """Take results of a loaded and fitted measurement."""
+        return cls(
+            rack=measurement.rack_name,
+            frequency_mhz=measurement.frequency_mhz,
+            a=float(measurement.a_opti),
+            b=float(measurement.b_opti),
+            r_squared=float(measurement.r_squared),
+            sample=np.asarray(measurement._sample),
+        )
+
+
+#: Take a base folder, give the fit results of every sweep
+Pipeline = Callable[[Path], Iterable[FitResult]]
+
+
+@dataclass
+class Tolerances:
+    """Hold the maximum accepted differences with the reference."""
+
+    a: float = 1e-6
+    b: float = 1e-5
+    r_squared: float = 1e-9
+
+
+def reference(base_folder: Path) -> list[FitResult]:
+    """Load and fit with ``pd.read_csv`` and ``curve_fit``."""
+    with tempfile.TemporaryDirectory() as out_folder:
+        racks = SetOfRacks(base_folder, Path(out_folder))
+    return [
+        FitResult.from_measurement(m)
+        for rack in racks
+        for m in rack.measurements
+    ]
+
+
+def continuous_log(base_folder: Path) -> list[FitResult]:
+    """Load every file by blocks, as if it were a continuous log."""
+    results = []
+    for folder in base_folder.iterdir():
+        if not folder.is_dir():
+            continue
+        for filepath in folder.iterdir():
+            log = ContinuousLog(filepath, folder.name, min_peak_voltage=0.0)
+            results += [FitResult.from_measurement(s) for s in log.segments()]
+    return results
+
+
+CANDIDATES: dict[str, Pipeline] = {"continuous_log": continuous_log}
+
+
+def write_synthetic_tree(
+    base_folder: Path,
+    racks: Sequence[str] = ("E1", "E2", "E3"),
+    frequencies_mhz: Sequence[float] = (80.0, 120.0, 160.0),
+    n_p_dbm_points: int = 37,
+    seed: int = 0,
+) -> None:
+    """Create measurement files with random constants, noise and offsets.
+
+    Every file holds a flat baseline, the power sweep, then a ramp down, like
+    the actual measurements. About a third of the sweeps have their first
+    point stuck at -20dBm.
+
+    """
+    rng = np.random.default_rng(seed)
+    p_dbm = np.linspace(-30.0, 6.0, n_p_dbm_points)
+    header = "\t".join(("Sample index", "NI9205_Arc2", "NI9205_dBm"))
+    for rack in racks:
+        folder = base_folder / rack
+        folder.mkdir(parents=True, exist_ok=True)
+        for frequency in frequencies_mhz:
+            a = rng.normal(10.3, 0.05)
+            b = rng.normal(-51.0, 0.3)
+            sweep = (p_dbm - b) / a + rng.normal(0.0, 5e-3, p_dbm.size)
+            if rng.random() < 1.0 / 3.0:
+                sweep[0] = (-20.0 - b) / a
+            before = np.full(rng.integers(5, 30), 0.05)
+            after = np.linspace(sweep[-1], 0.05, rng.integers(10, 40))[1:]
+            voltage = np.concatenate((before, sweep, after))
+            power = np.concatenate(
+                (np.full(before.size, 5.0), p_dbm, np.full(after.size, 5.0))
+            )
+            lines = [header] + [
+                f"{i + 1}\t{v:.9E}\t{p:.9E}".replace(".", ",")
+                for i, (v, p) in enumerate(zip(voltage, power))
+            ]
+            filepath = folder / f"Mesure{rack}-{frequency:.0f}MHz.txt"
+            filepath.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+#: Rack name and frequency in MHz
+Key = tuple[str, float]
+
+
+def _by_key(results: Iterable[FitResult]) -> dict[Key, list[FitResult]]:
+    """Group results by rack and frequency, keeping their order."""
+    grouped: dict[Key, list[FitResult]] = {}
+    for result in results:
+        grouped.setdefault((result.rack, result.frequency_mhz), []).append(
+            result
+        )
+    return grouped
+
+
+def compare(
+    expected: Sequence[FitResult],
+    actual: Sequence[FitResult],
+    tolerances: Tolerances,
+) -> list[str]:
+    """Give all the differences between two sets of results.
+
+    Sweeps are matched by rack and frequency, in order. A different number
+    of sweeps for a key, eg a spurious extra detection, is an error.
+
+    """
+    expected_by_key, actual_by_key = _by_key(expected), _by_key(actual)
+    errors = []
+    for key in sorted(expected_by_key.keys() | actual_by_key.keys()):
+        refs = expected_by_key.get(key, [])
+        news = actual_by_key.get(key, [])
+        if len(news) != len(refs):
+            errors.append(
+                f"{key}: {len(news)} sweep(s) instead of {len(refs)}"
+            )
+            continue
+        for ref, new in zip(refs, news):
+            for name in ("a", "b", "r_squared"):
+                delta = abs(getattr(ref, name) - getattr(new, name))
+                if not delta <= getattr(tolerances, name):
+                    errors.append(f"{key}: {name} differs by {delta:.3e}")
+            if not np.array_equal(ref.sample, new.sample):
+                errors.append(f"{key}: different samples selected for fit")
+    return errors
+
+
+def write_concatenated_log(
+    filepaths: Sequence[Path],
+    log_filepath: Path,
+    repeat: int = 1,
+    column_name: str = "NI9205_Arc2",
+    sep: str = "\t",
+    n_p_dbm_points: int | None = None,
+) -> None:
+    """Put the sweeps of ``filepaths`` back to back, ``repeat`` times.
+
+    Only the ``Sample index`` and ``column_name`` columns are kept. Sample
+    indexes are not renumbered, so that every sweep selects the same samples
+    as in its original file. If ``n_p_dbm_points`` is given, only the
+    ``n_p_dbm_points`` samples ending at the voltage peak of every file are
+    kept, so that there is no sample between two sweeps.
+
+    """
+    rows = []
+    for filepath in filepaths:
+        lines = filepath.read_text(encoding="utf-8").splitlines()
+        header = lines[0].split(sep)
+        idx = header.index(column_name)
+        file_rows, voltage = [], []
+        for line in lines[1:]:
+            cells = line.split(sep)
+            if len(cells) > idx and cells[0] and cells[idx]:
+                file_rows.append(f"{cells[0]}{sep}{cells[idx]}")
+                voltage.append(float(cells[idx].replace(",", ".")))
+        if n_p_dbm_points is not None:
+            idx_end = int(np.argmax(voltage))
+            file_rows = file_rows[idx_end - n_p_dbm_points + 1 : idx_end + 1]
+        rows += file_rows
+    content = sep.join(("Sample index", column_name)) + "\n"
+    content += "\n".join(rows * repeat) + "\n"
+    log_filepath.write_text(content, encoding="utf-8")
@@ -0,0 +1,10 @@
+"""Check that heavy dependencies are only imported when they are used."""
+
+import pytest
+from pytest_helpers.import_time import check, modules
+
+
+@pytest.mark.parametrize("module", modules())
+def test_no_heavy_dependency_at_import(module: str) -> None:
+    """Check that ``module`` does not import matplotlib, pandas nor scipy."""
+    assert check(module) == []
@@ -0,0 +1,106 @@
+"""Check that optimized pipelines give the same results as the reference."""
+
+from pathlib import Path
+
+import pytest
+from multipac_testbench_calibrate_racks.continuous_log import ContinuousLog
+from pytest_helpers.regression import (
+    BUNDLED,
+    CANDIDATES,
+    FitResult,
+    Tolerances,
+    compare,
+    reference,
+    write_concatenated_log,
+    write_synthetic_tree,
+)
+
+SYNTHETIC_SEEDS = (0, 1, 2)
+
+
+@pytest.fixture(
+    scope="module",
+    params=["bundled", *(f"synthetic-{seed}" for seed in SYNTHETIC_SEEDS)],
+)
+def tree(request: pytest.FixtureRequest, tmp_path_factory) -> Path:
+    """Give a measurement tree: the bundled one or a synthetic one."""
+    if request.param == "bundled":
+        return BUNDLED
+    seed = int(request.param.split("-")[1])
+    base_folder = tmp_path_factory.mktemp(request.param)
+    write_synthetic_tree(base_folder, seed=seed)
+    return base_folder
+
+
+@pytest.fixture(scope="module")
+def expected(tree: Path) -> list[FitResult]:
+    """Give the results of the reference pipeline."""
+    return reference(tree)
+
+
+@pytest.mark.parametrize("name", CANDIDATES)
+def test_candidate_matches_reference(
+    name: str, tree: Path, expected: list[FitResult]
+) -> None:
+    """Check ``a``, ``b``, ``R²`` and fitted samples of every sweep."""
+    actual = list(CANDIDATES[name](tree))
+    assert compare(expected, actual, Tolerances()) == []
+
+
+@pytest.fixture(scope="module", params=["with-gaps", "gap-free"])
+def concatenated_log(
+    request: pytest.FixtureRequest, tmp_path_factory
+) -> tuple[Path, list[float], list[FitResult]]:
+    """Give a log of 140 sweeps, their frequencies and expected results.
+
+    In the ``"gap-free"`` log, every sweep immediately follows the previous
+    one, without baseline nor ramp down.
+
+    """
+    repeat = 20
+    folder = BUNDLED / "E1"
+    expected = reference(BUNDLED)
+    expected = [result for result in expected if result.rack == "E1"]
+    filepaths = [
+        folder / f"MesureE1-{result.frequency_mhz:.0f}MHz.txt"
+        for result in expected
+    ]
+    log_filepath = tmp_path_factory.mktemp("log") / "MesureE1-log.txt"
+    write_concatenated_log(
+        filepaths,
+        log_filepath,
+        repeat=repeat,
+        n_p_dbm_points=37 if request.param == "gap-free" else None,
+    )
+    frequencies_mhz = [result.frequency_mhz for result in expected] * repeat
+    return log_filepath, frequencies_mhz, expected * repeat
+
+
+@pytest.mark.parametrize("chunksize", (5, 37, 50, 111, 1000, 100_000))
+def test_continuous_log_chunk_boundaries(
+    chunksize: int,
+    concatenated_log: tuple[Path, list[float], list[FitResult]],
+) -> None:
+    """Check that sweeps across block boundaries are found once, unchanged."""
+    log_filepath, frequencies_mhz, expected = concatenated_log
+    log = ContinuousLog(
+        log_filepath,
+        "E1",
+        frequencies_mhz=frequencies_mhz,
+        chunksize=chunksize,
+    )
+    actual = [FitResult.from_measurement(s) for s in log.segments()]
+    assert len(actual) == len(expected)
+    assert compare(expected, actual, Tolerances()) == []
+
+
+def test_continuous_log_more_sweeps_than_frequencies(
+    concatenated_log: tuple[Path, list[float], list[FitResult]],
+) -> None:
+    """Check that missing frequencies give a clear error."""
+    log_filepath, frequencies_mhz, _ = concatenated_log
+    log = ContinuousLog(
+        log_filepath, "E1", frequencies_mhz=frequencies_mhz[:-1]
+    )
+    with pytest.raises(ValueError, match="More sweeps were found"):
+        log.fitting_constants()